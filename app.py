@@ -3,240 +3,116 @@ MÓDULO: app.py - SISTEMA COMPLETO DE RECOMENDAÇÃO DE GAMES
 DESCRIÇÃO: Aplicação Flask com API REST e interface web
 """
 
-from flask import Flask, render_template, request, jsonify
-import sqlite3
+from flask import Flask, Response, render_template, request, jsonify
+import gzip
+import hashlib
 import json
-from datetime import datetime
+import math
+import os
+from database import DatabaseManager
+from recommender import check_engine_options, create_engine
 
-app = Flask(__name__)
-
-# ================= BANCO DE DADOS SIMPLES =================
-class DatabaseManager:
-    def __init__(self, db_name='games.db'):
-        self.db_name = db_name
-        self.init_database()
-    
-    def init_database(self):
-        """Inicializa o banco apenas se a tabela não existir"""
-        conn = sqlite3.connect(self.db_name)
-        c = conn.cursor()
-        
-        # Verifica se a tabela já existe
-        c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='games'")
-        if c.fetchone():
-            print("Tabela já existe")
-            conn.close()
-            return
-        
-        # Só cria se não existir
-        print("Criando tabela pela primeira vez")
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
-        """Inicializa o banco de dados com tabela e dados de exemplo"""
-        conn = sqlite3.connect(self.db_name)
-        c = conn.cursor()
-        
-        # Cria tabela se não existir
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS games (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                genre TEXT NOT NULL,
-                platform TEXT NOT NULL,
-                price REAL,
-                rating REAL,
-                description TEXT,
-                tags TEXT
-            )
-        ''')
-        
-        # Dados de exemplo
-        sample_games = [
-            ('The Witcher 3: Wild Hunt', 'RPG', 'PC, PS4, XBOX', 79.90, 9.7, 
-             'RPG de mundo aberto em universo fantástico', '["rpg", "open-world", "fantasy", "story-rich"]'),
-            
-            ('Counter-Strike 2', 'FPS', 'PC', 0.00, 9.3, 
-             'FPS tático multiplayer competitivo', '["fps", "multiplayer", "competitive", "shooter"]'),
-            
-            ('FIFA 23', 'Sports', 'PC, PS5, XBOX', 249.90, 8.5, 
-             'Simulador de futebol com times reais', '["sports", "soccer", "multiplayer", "simulation"]'),
-            
-            ('Cyberpunk 2077', 'RPG', 'PC, PS5, XBOX', 199.90, 8.9, 
-             'RPG de ação em mundo aberto cyberpunk', '["rpg", "open-world", "cyberpunk", "futuristic"]'),
-            
-            ('Red Dead Redemption 2', 'Action-Adventure', 'PC, PS4, XBOX', 189.90, 9.8, 
-             'Aventura no velho oeste americano', '["action", "adventure", "open-world", "western"]'),
-            
-            ('Minecraft', 'Sandbox', 'Todas as plataformas', 89.90, 9.5, 
-             'Jogo sandbox de construção e exploração', '["sandbox", "creative", "multiplayer", "exploration"]'),
-            
-            ('Grand Theft Auto V', 'Action', 'PC, PS4, XBOX', 129.90, 9.6, 
-             'Mundo aberto com história criminal', '["open-world", "action", "crime", "multiplayer"]'),
-            
-            ('Fortnite', 'Battle Royale', 'Todas as plataformas', 0.00, 8.7, 
-             'Battle Royale com construção e elementos únicos', '["battle-royale", "shooter", "multiplayer", "building"]')
-        ]
-        
-        # Insere dados
-        c.executemany('''
-            INSERT OR IGNORE INTO games (title, genre, platform, price, rating, description, tags)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', sample_games)
-        
-        conn.commit()
-        conn.close()
-        print("✅ Banco de dados inicializado com sucesso!")
-        print("📊 Dados de exemplo inseridos!")
-    
-    def get_all_games(self):
-        """Retorna todos os jogos do banco"""
-        conn = sqlite3.connect(self.db_name)
-        c = conn.cursor()
-        c.execute('SELECT * FROM games ORDER BY title')
-        
-        games = []
-        for row in c.fetchall():
-            games.append({
-                'id': row[0],
-                'title': row[1],
-                'genre': row[2],
-                'platform': row[3],
-                'price': row[4],
-                'rating': row[5],
-                'description': row[6],
-                'tags': json.loads(row[7]) if row[7] else []
-            })
-        
-        conn.close()
-        return games
+app = Flask(__name__)
 
-# ================= SISTEMA DE RECOMENDAÇÃO SIMPLES =================
-class SimpleRecommender:
-    """Sistema de recomendação simplificado e confiável"""
-    
-    def __init__(self):
-        print("Sistema de recomendação simples inicializado")
-        self.games = [
-            {
-                'title': 'The Witcher 3: Wild Hunt',
-                'genre': 'RPG',
-                'platform': 'PC, PS4, XBOX',
-                'price': 79.90,
-                'rating': 9.7,
-                'description': 'RPG de mundo aberto em universo fantástico',
-                'tags': ['rpg', 'open-world', 'fantasy']
-            },
-            {
-                'title': 'Cyberpunk 2077',
-                'genre': 'RPG',
-                'platform': 'PC, PS5, XBOX',
-                'price': 199.90,
-                'rating': 8.9,
-                'description': 'RPG de ação em mundo aberto cyberpunk',
-                'tags': ['rpg', 'open-world', 'cyberpunk']
-            },
-            {
-                'title': 'Red Dead Redemption 2',
-                'genre': 'Action-Adventure',
-                'platform': 'PC, PS4, XBOX',
-                'price': 189.90,
-                'rating': 9.8,
-                'description': 'Aventura no velho oeste americano',
-                'tags': ['action', 'adventure', 'open-world']
-            },
-            {
-                'title': 'Elden Ring',
-                'genre': 'RPG',
-                'platform': 'PC, PS4, PS5, XBOX',
-                'price': 249.90,
-                'rating': 9.5,
-                'description': 'RPG de ação em mundo aberto dark fantasy',
-                'tags': ['rpg', 'open-world', 'fantasy', 'challenging']
-            },
-            {
-                'title': 'God of War',
-                'genre': 'Action-Adventure',
-                'platform': 'PC, PS4, PS5',
-                'price': 199.90,
-                'rating': 9.4,
-                'description': 'Aventura épica na mitologia nórdica',
-                'tags': ['action', 'adventure', 'story-rich', 'norse']
-            }
-        ]
-    
-    def recommend_games(self, game_title, top_n=3):
-        """Recomenda jogos baseado no título"""
-        try:
-            # Simula recomendações baseadas no gênero
-            target_game = None
-            for game in self.games:
-                if game_title.lower() in game['title'].lower():
-                    target_game = game
-                    break
-            
-            if not target_game:
-                return self.games[:top_n]
-            
-            # Recomenda jogos do mesmo gênero
-            recommendations = []
-            for game in self.games:
-                if game['title'] != target_game['title'] and game['genre'] == target_game['genre']:
-                    recommendations.append(game)
-                if len(recommendations) >= top_n:
-                    break
-            
-            return recommendations if recommendations else self.games[:top_n]
-            
-        except Exception as e:
-            print(f"Erro na recomendação simples: {e}")
-            return self.games[:top_n]
-    
-    def recommend_by_features(self, features, top_n=3):
-        """Recomenda baseado em features textuais"""
-        try:
-            # Simples matching de keywords
-            features_lower = features.lower()
-            recommendations = []
-            
-            for game in self.games:
-                score = 0
-                game_text = f"{game['title']} {game['genre']} {game['description']} {' '.join(game['tags'])}".lower()
-                
-                if any(word in game_text for word in features_lower.split()):
-                    score += 1
-                
-                if score > 0:
-                    recommendations.append((game, score))
-            
-            # Ordena por score e retorna
-            recommendations.sort(key=lambda x: x[1], reverse=True)
-            return [game for game, score in recommendations[:top_n]]
-            
-        except Exception as e:
-            print(f"Erro na recomendação por features: {e}")
-            return self.games[:top_n]
+# ================= CONFIGURAÇÃO =================
+# Backend de recomendação: tfidf, ann, precomputed ou keyword
+app.config['RECOMMENDER_ENGINE'] = os.environ.get('GAMEREC_ENGINE', 'tfidf')
+# Parâmetros do backend em JSON, ex.: {"n_tables": 4, "n_bits": 12, "n_components": 64}
+app.config['RECOMMENDER_OPTIONS'] = json.loads(os.environ.get('GAMEREC_ENGINE_OPTIONS') or '{}')
+app.config['DATABASE'] = os.environ.get('GAMEREC_DB', 'games.db')
+# Respostas JSON menores que isso (bytes) não são comprimidas
+app.config['COMPRESS_MIN_SIZE'] = 500
 
 # ================= INICIALIZAÇÃO DA APLICAÇÃO =================
 print("🎮" + "="*60)
 print("🎮 INICIANDO GAME REC - SISTEMA DE RECOMENDAÇÃO DE GAMES")
 print("🎮" + "="*60)
 
-# Inicializa banco de dados
-db = DatabaseManager()
+# Inicializa banco de dados (única fonte do catálogo)
+db = DatabaseManager(app.config['DATABASE'])
+db.ensure_sample_data()
 
 # Inicializa sistema de recomendação
+engine_name = app.config['RECOMMENDER_ENGINE']
+engine_options = app.config['RECOMMENDER_OPTIONS']
+if not isinstance(engine_options, dict):
+    raise ValueError("GAMEREC_ENGINE_OPTIONS deve ser um objeto JSON")
+
+# Backend ou parâmetro desconhecido é erro de configuração: a aplicação não deve subir
+check_engine_options(engine_name, engine_options)
+
 try:
-    # Tenta importar o sistema avançado
-    from recommender import GameRecommender
-    recommender = GameRecommender()
-    print("Sistema de recomendação avançado carregado")
-except ImportError as e:
-    print(f"Sistema avançado não disponível: {e}")
-    print("Usando sistema de recomendação simples")
-    recommender = SimpleRecommender()
-except Exception as e:
-    print(f"Erro no sistema avançado: {e}")
-    print("Usando sistema de recomendação simples...")
-    recommender = SimpleRecommender()
+    recommender = create_engine(engine_name, db=db, **engine_options)
+    print(f"Sistema de recomendação carregado: {recommender.name}")
+except Exception:
+    # Falha em tempo de execução de um backend conhecido: mesmo catálogo,
+    # backend por palavras-chave; o campo 'engine' das respostas indica qual
+    app.logger.warning(
+        "Falha ao carregar backend '%s'; usando 'keyword'", engine_name, exc_info=True
+    )
+    recommender = create_engine('keyword', db=db)
+
+# ================= VALIDAÇÃO =================
+def parse_diversity(value):
+    """Converte o parâmetro diversity; retorna None se não for um número finito em [0, 1]"""
+    if isinstance(value, bool):
+        return None
+    try:
+        diversity = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(diversity) or not 0.0 <= diversity <= 1.0:
+        return None
+    return diversity
+
+DIVERSITY_ERROR = 'Parâmetro "diversity" deve ser um número entre 0 e 1'
+
+# ================= RESPOSTAS =================
+def recommendations_response(meta, ranked, compact=False):
+    """
+    Monta a resposta concatenando os fragmentos JSON pré-calculados
+    meta: campos do envelope (success, engine, ...)
+    ranked: lista de (índice, score) retornada pelo backend
+    """
+    meta = dict(meta, count=len(ranked))
+    body = (
+        json.dumps(meta, ensure_ascii=False)[:-1]
+        + ', "recommendations": ' + recommender.to_json(ranked, compact) + '}'
+    )
+    return Response(body, mimetype='application/json')
+
+def request_etag(*parts):
+    """ETag derivado da versão do modelo + parâmetros da consulta"""
+    key = json.dumps([recommender.model_version, request.path, *parts], ensure_ascii=False)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+@app.after_request
+def compress_response(response):
+    """Comprime respostas JSON com brotli ou gzip, conforme Accept-Encoding"""
+    if (response.status_code != 200 or response.direct_passthrough
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        response.set_data(brotli.compress(data))
+        response.headers['Content-Encoding'] = 'br'
+    elif accepted['gzip']:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    
+    return response
 
 # ================= ROTAS DA API =================
 @app.route('/')
@@ -267,6 +143,8 @@ def recommend_by_title():
     try:
         game_title = request.args.get('title', '').strip()
         top_n = int(request.args.get('n', 3))
+        diversity = parse_diversity(request.args.get('diversity', 0.0))
+        compact = request.args.get('format') == 'compact'
         
         if not game_title:
             return jsonify({
@@ -274,14 +152,31 @@ def recommend_by_title():
                 'error': 'Parâmetro "title" é obrigatório'
             }), 400
         
-        recommendations = recommender.recommend_games(game_title, top_n)
+        if diversity is None:
+            return jsonify({
+                'success': False,
+                'error': DIVERSITY_ERROR
+            }), 400
         
-        return jsonify({
+        # Mesma versão do modelo + mesma consulta = mesma resposta
+        etag = request_etag(game_title, top_n, diversity, compact)
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            response.vary.add('Accept-Encoding')
+            return response
+        
+        ranked = recommender.rank_games(game_title, top_n, diversity)
+        
+        response = recommendations_response({
             'success': True,
             'input_game': game_title,
-            'count': len(recommendations),
-            'recommendations': recommendations
-        })
+            'engine': recommender.name,
+            'diversity': diversity
+        }, ranked, compact)
+        # ETag fraco: a representação pode variar pela compressão
+        response.set_etag(etag, weak=True)
+        return response
         
     except Exception as e:
         return jsonify({
@@ -304,6 +199,8 @@ def recommend_by_features():
         
         features = data['features'].strip()
         top_n = data.get('n', 3)
+        diversity = parse_diversity(data.get('diversity', 0.0))
+        compact = data.get('format') == 'compact'
         
         if not features:
             return jsonify({
@@ -311,14 +208,20 @@ def recommend_by_features():
                 'error': 'Campo "features" não pode estar vazio'
             }), 400
         
-        recommendations = recommender.recommend_by_features(features, top_n)
+        if diversity is None:
+            return jsonify({
+                'success': False,
+                'error': DIVERSITY_ERROR
+            }), 400
+        
+        ranked = recommender.rank_by_features(features, top_n, diversity)
         
-        return jsonify({
+        return recommendations_response({
             'success': True,
             'input_features': features,
-            'count': len(recommendations),
-            'recommendations': recommendations
-        })
+            'engine': recommender.name,
+            'diversity': diversity
+        }, ranked, compact)
         
     except Exception as e:
         return jsonify({
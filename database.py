@@ -9,17 +9,26 @@ import json
 from pathlib import Path
 
 class DatabaseManager:
-    def __init__(self, db_name='games.db'):
+    def __init__(self, db_name='games.db', read_only=False):
         """
         Inicializa o gerenciador do banco de dados
         db_name: nome do arquivo do banco de dados SQLite
+        read_only: abre o banco só para leitura (não cria tabelas nem escreve)
         """
         self.db_name = db_name
-        self.init_database()
+        self.read_only = read_only
+        if not read_only:
+            self.init_database()
+    
+    def _connect(self):
+        """Abre uma conexão, em modo somente leitura se configurado"""
+        if self.read_only:
+            return sqlite3.connect(Path(self.db_name).resolve().as_uri() + '?mode=ro', uri=True)
+        return sqlite3.connect(self.db_name)
     
     def init_database(self):
         """Inicializa o banco de dados com tabelas necessárias"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self._connect()
         c = conn.cursor()
         
         # Tabela de jogos
@@ -45,6 +54,21 @@ class DatabaseManager:
             )
         ''')
         
+        # Cache de tokens normalizados: uma linha por jogo, válida enquanto
+        # o hash do conteúdo (texto + configuração do pipeline) não mudar
+        c.execute("PRAGMA table_info(token_cache)")
+        columns = [row[1] for row in c.fetchall()]
+        if columns and 'game_id' not in columns:
+            # Formato antigo (chave só pelo hash); é apenas cache, pode ser recriado
+            c.execute('DROP TABLE token_cache')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS token_cache (
+                game_id INTEGER PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                tokens TEXT  -- Armazena tokens como JSON
+            )
+        ''')
+        
         conn.commit()
         conn.close()
         print("Banco de dados inicializado com sucesso")
@@ -123,10 +147,28 @@ class DatabaseManager:
                 'rating': 8.7,
                 'description': 'Battle Royale com construção e elementos únicos',
                 'tags': json.dumps(['battle-royale', 'shooter', 'multiplayer', 'building'])
+            },
+            {
+                'title': 'Cyberpunk 2077',
+                'genre': 'RPG',
+                'platform': 'PC, PS5, XBOX',
+                'price': 199.90,
+                'rating': 8.9,
+                'description': 'RPG de ação em mundo aberto cyberpunk',
+                'tags': json.dumps(['rpg', 'open-world', 'cyberpunk', 'futuristic'])
+            },
+            {
+                'title': 'Red Dead Redemption 2',
+                'genre': 'Action-Adventure',
+                'platform': 'PC, PS4, XBOX',
+                'price': 189.90,
+                'rating': 9.8,
+                'description': 'Aventura no velho oeste americano',
+                'tags': json.dumps(['action', 'adventure', 'open-world', 'western'])
             }
         ]
         
-        conn = sqlite3.connect(self.db_name)
+        conn = self._connect()
         c = conn.cursor()
         
         for game in sample_games:
@@ -142,9 +184,23 @@ class DatabaseManager:
         conn.close()
         print("Dados de exemplo inseridos com sucesso")
     
+    def get_game_count(self):
+        """Retorna o número de títulos distintos no banco"""
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute('SELECT COUNT(DISTINCT title) FROM games')
+        count = c.fetchone()[0]
+        conn.close()
+        return count
+    
+    def ensure_sample_data(self):
+        """Insere os dados de exemplo apenas se o banco estiver vazio"""
+        if self.get_game_count() == 0:
+            self.insert_sample_data()
+    
     def get_all_games(self):
         """Retorna todos os jogos do banco SEM DUPLICATAS"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self._connect()
         c = conn.cursor()
         
         # GROUP BY title para evitar duplicatas
@@ -173,7 +229,7 @@ class DatabaseManager:
 
     def get_game_by_title(self, title):
         """Busca jogo pelo título (case insensitive)"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self._connect()
         c = conn.cursor()
         c.execute('SELECT * FROM games WHERE LOWER(title) LIKE LOWER(?)', (f'%{title}%',))
         
@@ -188,9 +244,52 @@ class DatabaseManager:
         conn.close()
         return games
 
+    def get_cached_tokens(self, game_ids):
+        """Retorna {game_id: (hash, tokens)} para os jogos presentes no cache"""
+        if not game_ids:
+            return {}
+        
+        conn = self._connect()
+        c = conn.cursor()
+        
+        cached = {}
+        ids = list(game_ids)
+        # SQLite limita o número de parâmetros por consulta
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            c.execute(
+                f'SELECT game_id, content_hash, tokens FROM token_cache WHERE game_id IN ({placeholders})',
+                chunk
+            )
+            for game_id, content_hash, tokens in c.fetchall():
+                cached[game_id] = (content_hash, json.loads(tokens))
+        
+        conn.close()
+        return cached
+    
+    def save_cached_tokens(self, entries):
+        """
+        Salva {game_id: (hash, tokens)} no cache, substituindo a linha do jogo,
+        e remove entradas de jogos que não existem mais
+        """
+        conn = self._connect()
+        c = conn.cursor()
+        c.executemany('''
+            INSERT OR REPLACE INTO token_cache (game_id, content_hash, tokens)
+            VALUES (?, ?, ?)
+        ''', [
+            (game_id, content_hash, json.dumps(tokens))
+            for game_id, (content_hash, tokens) in entries.items()
+        ])
+        c.execute('DELETE FROM token_cache WHERE game_id NOT IN (SELECT id FROM games)')
+        
+        conn.commit()
+        conn.close()
+
 # Teste do módulo
 if __name__ == '__main__':
     db = DatabaseManager()
-    db.insert_sample_data()
+    db.ensure_sample_data()
 
     print("Jogos no banco:", len(db.get_all_games()))
@@ -0,0 +1,306 @@
+﻿"""
+MÓDULO: evaluation.py
+DESCRIÇÃO: Avaliação offline dos backends de recomendação (qualidade x latência)
+HABILIDADES: Métricas de ranking, Benchmark, Fronteira de Pareto
+
+Uso:
+    python evaluation.py                          # catálogo sintético + rótulos por tags/gênero
+    python evaluation.py --synthetic-size 0       # só o catálogo do banco
+    python evaluation.py --interactions log.csv   # log de interações (user_id, game_id)
+    python evaluation.py --configs grid.json --output pareto.csv
+
+O banco é aberto somente para leitura e os backends rodam sem cache de
+tokens (db=None): a avaliação nunca escreve no banco de produção.
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from database import DatabaseManager
+from recommender import create_engine
+
+# Configurações avaliadas por padrão: engine + diversity + parâmetros do backend
+DEFAULT_CONFIGS = [
+    {'engine': 'keyword'},
+    {'engine': 'tfidf', 'max_features': 100},
+    {'engine': 'tfidf', 'max_features': 300},
+    {'engine': 'tfidf', 'max_features': 1000},
+    {'engine': 'tfidf', 'max_features': 1000, 'diversity': 0.3},
+    {'engine': 'precomputed', 'n_neighbors': 20},
+    {'engine': 'ann', 'n_tables': 4, 'n_bits': 12, 'min_candidates': 0},
+    {'engine': 'ann', 'n_tables': 8, 'n_bits': 10, 'min_candidates': 0},
+    {'engine': 'ann', 'n_tables': 4, 'n_bits': 12, 'n_components': 64, 'min_candidates': 0},
+]
+
+# Diferenças de custo menores que isso (relativas) não decidem a fronteira de Pareto
+PARETO_TOLERANCE = 0.05
+
+
+# ================= CATÁLOGO =================
+def synthetic_catalog(games, size, seed=42):
+    """
+    Gera um catálogo maior a partir do real, para que os backends aproximados
+    tenham o que aproximar: cada jogo parte de um jogo real e mistura gênero,
+    tags e palavras da descrição com as de outros jogos
+    """
+    rng = random.Random(seed)
+    genres = sorted({game['genre'] for game in games})
+    tags = sorted({tag for game in games for tag in game['tags']})
+    words = sorted({word for game in games for word in game['description'].split()})
+
+    catalog = []
+    for i in range(size):
+        base = rng.choice(games)
+        genre = base['genre'] if rng.random() < 0.7 else rng.choice(genres)
+        game_tags = rng.sample(base['tags'], min(2, len(base['tags'])))
+        game_tags += [tag for tag in rng.sample(tags, 2) if tag not in game_tags]
+        description = base['description'].split()[:4] + rng.sample(words, min(4, len(words)))
+        catalog.append({
+            'id': i + 1,
+            'title': f"{base['title']} #{i + 1}",
+            'genre': genre,
+            'platform': base['platform'],
+            'price': base['price'],
+            'rating': base['rating'],
+            'description': ' '.join(description),
+            'tags': game_tags,
+        })
+    return catalog
+
+
+# ================= RÓTULOS =================
+def synthetic_labels(games, min_overlap=2, max_queries=None, seed=42):
+    """
+    Rótulos derivados do próprio catálogo: o ganho de um par de jogos é o
+    número de tags em comum (+1 se o gênero é o mesmo)
+    max_queries: amostra de jogos usados como consulta (None = todos)
+    Retorna lista de (índice da consulta, {índice relevante: ganho})
+    """
+    query_indices = range(len(games))
+    if max_queries and max_queries < len(games):
+        query_indices = sorted(random.Random(seed).sample(query_indices, max_queries))
+
+    queries = []
+    for i in query_indices:
+        game = games[i]
+        tags = set(game['tags'])
+        relevant = {}
+        for j, other in enumerate(games):
+            if i == j:
+                continue
+            gain = len(tags & set(other['tags'])) + (game['genre'] == other['genre'])
+            if gain >= min_overlap:
+                relevant[j] = gain
+        if relevant:
+            queries.append((i, relevant))
+    return queries
+
+
+def interaction_labels(games, path):
+    """
+    Rótulos de um log de interações CSV (colunas user_id, game_id e,
+    opcionalmente, timestamp). Para cada usuário, a última interação é
+    separada (held-out) e a penúltima é usada como consulta.
+    """
+    log = pd.read_csv(path)
+    if 'timestamp' in log.columns:
+        log = log.sort_values(['user_id', 'timestamp'], kind='stable')
+
+    index_by_id = {game['id']: i for i, game in enumerate(games)}
+    queries = []
+    for _, history in log.groupby('user_id', sort=False):
+        items = [index_by_id[g] for g in history['game_id'] if g in index_by_id]
+        if len(items) >= 2 and items[-1] != items[-2]:
+            queries.append((items[-2], {items[-1]: 1}))
+    return queries
+
+
+# ================= MÉTRICAS =================
+def ndcg_at_k(ranked, relevant, k):
+    """NDCG@k com ganhos graduados"""
+    dcg = sum(relevant.get(idx, 0) / math.log2(pos + 2) for pos, idx in enumerate(ranked[:k]))
+    ideal = sorted(relevant.values(), reverse=True)[:k]
+    idcg = sum(gain / math.log2(pos + 2) for pos, gain in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def split_config(config):
+    """Separa engine e diversity dos parâmetros do backend"""
+    options = dict(config)
+    name = options.pop('engine')
+    diversity = options.pop('diversity', 0.0)
+    return name, diversity, options
+
+
+def build_engine(name, games, options):
+    """Backend sobre a lista de jogos, sem banco (nenhuma escrita no cache de tokens)"""
+    return create_engine(name, db=None, games=games, **options)
+
+
+def warm_up(configs, games, queries, k):
+    """
+    Constrói e consulta cada configuração uma vez antes de medir, para que
+    custos únicos (imports, alocações) não caiam na primeira
+    """
+    for config in configs:
+        name, diversity, options = split_config(config)
+        engine = build_engine(name, games, options)
+        for query_index, _ in queries:
+            engine.rank_by_index(query_index, k, diversity)
+
+
+def evaluate_config(config, games, queries, k, repeats=5):
+    """
+    Constrói o backend, reproduz as consultas e mede qualidade, latência e memória
+    repeats: repetições de cada medida de tempo (reporta a mediana)
+    """
+    name, diversity, options = split_config(config)
+
+    # Tempo de construção: mediana de várias execuções, sem tracemalloc
+    build_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        engine = build_engine(name, games, options)
+        build_times.append(time.perf_counter() - start)
+
+    # Memória: execução separada, usada só para o pico de alocação
+    tracemalloc.start()
+    build_engine(name, games, options)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    precisions, recalls, ndcgs, latencies = [], [], [], []
+    scanned, exact = [], []
+    recommended = set()
+    for query_index, relevant in queries:
+        # Latência da consulta: mediana das repetições
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            ranked = [idx for idx, _ in engine.rank_by_index(query_index, k, diversity)]
+            timings.append(time.perf_counter() - start)
+        latencies.append(np.median(timings))
+
+        # Backends aproximados informam quantos jogos a consulta avalia
+        if hasattr(engine, 'query_stats'):
+            stats = engine.query_stats(query_index, k, diversity)
+            scanned.append(stats['scanned'])
+            exact.append(stats['exact'])
+
+        hits = sum(1 for idx in ranked if idx in relevant)
+        precisions.append(hits / k)
+        recalls.append(hits / len(relevant))
+        ndcgs.append(ndcg_at_k(ranked, relevant, k))
+        recommended.update(ranked)
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'config': json.dumps(config, sort_keys=True),
+        'engine': name,
+        f'precision@{k}': float(np.mean(precisions)),
+        f'recall@{k}': float(np.mean(recalls)),
+        f'ndcg@{k}': float(np.mean(ndcgs)),
+        'coverage': len(recommended) / len(games),
+        # NaN para backends exatos, que sempre avaliam o catálogo inteiro
+        'scanned': float(np.mean(scanned)) if scanned else float('nan'),
+        'exact_share': float(np.mean(exact)) if exact else float('nan'),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'build_s': float(np.median(build_times)),
+        'peak_mb': peak_memory / 1024 ** 2,
+    }
+
+
+def pareto_front(results, quality, costs=('p95_ms', 'peak_mb'), tolerance=PARETO_TOLERANCE):
+    """
+    Marca as configurações não dominadas (mais qualidade, menos custo)
+    tolerance: custos dentro dessa diferença relativa contam como empate
+    """
+    def not_worse(a, b):
+        return a <= b * (1 + tolerance)
+
+    def better(a, b):
+        return a < b * (1 - tolerance)
+
+    for row in results:
+        row_quality = round(row[quality], 4)
+        row['pareto'] = not any(
+            round(other[quality], 4) >= row_quality
+            and all(not_worse(other[c], row[c]) for c in costs)
+            and (round(other[quality], 4) > row_quality or any(better(other[c], row[c]) for c in costs))
+            for other in results
+        )
+    return results
+
+
+def run_evaluation(configs, games, interactions=None, k=5, min_overlap=2, repeats=5,
+                   max_queries=200):
+    """Avalia cada configuração e retorna a tabela ordenada por NDCG"""
+    if interactions:
+        queries = interaction_labels(games, interactions)
+    else:
+        queries = synthetic_labels(games, min_overlap, max_queries)
+
+    if not queries:
+        raise ValueError("Nenhuma consulta com itens relevantes para avaliar")
+
+    print(f"Avaliando {len(configs)} configurações em {len(queries)} consultas "
+          f"sobre {len(games)} jogos (k={k})")
+    warm_up(configs, games, queries, k)
+    results = [evaluate_config(config, games, queries, k, repeats) for config in configs]
+    results = pareto_front(results, f'ndcg@{k}')
+
+    table = pd.DataFrame(results)
+    return table.sort_values([f'ndcg@{k}', 'p95_ms'], ascending=[False, True], ignore_index=True)
+
+
+# Execução pela linha de comando
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Avaliação offline do GameRecommender')
+    parser.add_argument('--db', default='games.db', help='banco SQLite com o catálogo (só leitura)')
+    parser.add_argument('--interactions', help='CSV com user_id, game_id[, timestamp]')
+    parser.add_argument('--synthetic-size', type=int, default=2000,
+                        help='gera um catálogo sintético desse tamanho a partir do banco '
+                             '(0 = usa só o banco; ignorado com --interactions)')
+    parser.add_argument('--max-queries', type=int, default=200,
+                        help='jogos amostrados como consulta nos rótulos sintéticos')
+    parser.add_argument('--configs', help='JSON com a lista de configurações a avaliar')
+    parser.add_argument('--k', type=int, default=5, help='tamanho da lista avaliada')
+    parser.add_argument('--min-overlap', type=int, default=2,
+                        help='ganho mínimo (tags em comum + gênero) para rótulos sintéticos')
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='repetições de cada medida de tempo (reporta a mediana)')
+    parser.add_argument('--output', help='salva a tabela em CSV')
+    args = parser.parse_args()
+
+    configs = DEFAULT_CONFIGS
+    if args.configs:
+        with open(args.configs, encoding='utf-8') as f:
+            configs = json.load(f)
+
+    games = DatabaseManager(args.db, read_only=True).get_all_games()
+    if args.synthetic_size and not args.interactions:
+        games = synthetic_catalog(games, args.synthetic_size)
+
+    table = run_evaluation(configs, games, args.interactions, args.k, args.min_overlap,
+                           args.repeats, args.max_queries)
+
+    print("\n📊 RESULTADOS (pareto = não dominada em NDCG x p95 x memória, "
+          f"custos com tolerância de {PARETO_TOLERANCE:.0%})")
+    print("scanned = jogos avaliados por consulta; exact_share = consultas que caíram na busca exata")
+    print(table.to_string(index=False, float_format=lambda x: f'{x:.4f}'))
+
+    for _, row in table[table['exact_share'] == 1.0].iterrows():
+        print(f"⚠️  {row['config']}: todas as consultas usaram busca exata; "
+              f"a linha não mede a aproximação (catálogo pequeno demais?)")
+
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"\nTabela salva em {args.output}")
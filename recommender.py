@@ -1,163 +1,547 @@
 ﻿"""
 MÓDULO: recommender.py - VERSÃO SIMPLIFICADA E FUNCIONAL
-DESCRIÇÃO: Sistema de recomendação de games
+DESCRIÇÃO: Sistema de recomendação de games com backends intercambiáveis
+(TF-IDF exato, ANN, vizinhos pré-calculados e fallback por palavras-chave)
 """
 
+import numpy as np
 import pandas as pd
+from sklearn.decomposition import TruncatedSVD
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+from scipy.sparse import issparse
+import hashlib
+import inspect
 import json
+from database import DatabaseManager
+from text_processing import GameTextAnalyzer
 
-class GameRecommender:  # ← NOME EXATO DA CLASSE
-    def __init__(self):
+# ================= REGISTRO DE BACKENDS =================
+ENGINES = {}
+
+def register_engine(name):
+    """Decorator: registra uma classe de backend com o nome dado"""
+    def decorator(cls):
+        cls.name = name
+        ENGINES[name] = cls
+        return cls
+    return decorator
+
+def engine_parameters(name):
+    """Parâmetros aceitos pelo backend, seguindo os **options repassados às classes-mãe"""
+    accepted = set()
+    for cls in ENGINES[name].__mro__:
+        if '__init__' not in vars(cls):
+            continue
+        params = inspect.signature(cls.__init__).parameters
+        accepted.update(n for n, p in params.items() if p.kind is p.POSITIONAL_OR_KEYWORD)
+        if not any(p.kind is p.VAR_KEYWORD for p in params.values()):
+            break
+    accepted.discard('self')
+    return accepted
+
+def check_engine_options(name, options):
+    """Levanta ValueError para backend ou parâmetros desconhecidos (erro de configuração)"""
+    if name not in ENGINES:
+        raise ValueError(f"Backend desconhecido: {name} (disponíveis: {', '.join(sorted(ENGINES))})")
+    unknown = set(options) - engine_parameters(name)
+    if unknown:
+        raise ValueError(f"Parâmetros desconhecidos para '{name}': {', '.join(sorted(unknown))}")
+
+def create_engine(name, db=None, **options):
+    """
+    Cria o backend registrado com o nome dado
+    db: DatabaseManager de onde o catálogo é carregado
+    options: parâmetros específicos do backend
+    """
+    check_engine_options(name, options)
+    return ENGINES[name](db=db, **options)
+
+
+class RecommenderEngine:
+    """Interface comum dos backends de recomendação"""
+    name = None
+
+    # Campos do jogo expostos nas respostas da API
+    PUBLIC_FIELDS = ('id', 'title', 'genre', 'platform', 'price', 'rating', 'description', 'tags')
+
+    def __init__(self, db=None, games=None):
+        """
+        db: DatabaseManager de onde o catálogo é carregado (e cache de tokens)
+        games: lista de jogos já carregada; com db=None nada é lido ou
+               escrito no banco
+        """
+        if games is None:
+            db = db if db is not None else DatabaseManager()
+            games = db.get_all_games()
+        self.db = db
+        self.games_data = games
+        self._build_payloads()
+
+    def _build_payloads(self):
+        """
+        Pré-serializa cada jogo em JSON (sem a chave final) para que as
+        respostas sejam montadas por concatenação, sem copiar dicts
+        """
+        self.payloads = [
+            json.dumps({field: game.get(field) for field in self.PUBLIC_FIELDS}, ensure_ascii=False)[:-1]
+            for game in self.games_data
+        ]
+
+    def config(self):
+        """Parâmetros do backend que afetam as recomendações"""
+        return {'engine': self.name}
+
+    @property
+    def model_version(self):
+        """Identifica backend + configuração + catálogo (usado nos ETags)"""
+        if getattr(self, '_model_version', None) is None:
+            digest = hashlib.sha1(json.dumps(self.config(), sort_keys=True).encode('utf-8'))
+            for payload in self.payloads:
+                digest.update(payload.encode('utf-8'))
+            self._model_version = digest.hexdigest()[:16]
+        return self._model_version
+
+    def rank_games(self, game_title, top_n=3, diversity=0.0):
+        """Lista de (índice, score) dos jogos similares ao título"""
+        game_index = self.find_game_index(game_title)
+
+        if game_index is None:
+            return self._fallback(top_n)
+
+        return self.rank_by_index(game_index, top_n, diversity)
+
+    def rank_by_index(self, game_index, top_n=3, diversity=0.0):
+        """Lista de (índice, score) dos jogos similares ao jogo na posição dada"""
+        raise NotImplementedError
+
+    def rank_by_features(self, features, top_n=3, diversity=0.0):
+        """Lista de (índice, score) dos jogos para as features textuais"""
+        raise NotImplementedError
+
+    def recommend_games(self, game_title, top_n=3, diversity=0.0):
+        """Recomenda jogos similares ao título"""
+        return self.to_games(self.rank_games(game_title, top_n, diversity))
+
+    def recommend_by_features(self, features, top_n=3, diversity=0.0):
+        """Recomenda jogos a partir de features textuais"""
+        return self.to_games(self.rank_by_features(features, top_n, diversity))
+
+    def to_games(self, ranked):
+        """(índice, score) -> cópias dos dicts dos jogos com similarity_score"""
+        recommendations = []
+        for idx, score in ranked:
+            rec_game = {field: self.games_data[idx].get(field) for field in self.PUBLIC_FIELDS}
+            if score is not None:
+                rec_game['similarity_score'] = score
+            recommendations.append(rec_game)
+        return recommendations
+
+    def to_json(self, ranked, compact=False):
+        """
+        (índice, score) -> array JSON já serializado
+        compact: apenas id e similarity_score de cada jogo
+        """
+        items = []
+        for idx, score in ranked:
+            if compact:
+                item = '{"id": %s' % json.dumps(self.games_data[idx].get('id'))
+            else:
+                item = self.payloads[idx]
+            if score is not None:
+                item += ', "similarity_score": %s' % json.dumps(score)
+            items.append(item + '}')
+        return '[' + ', '.join(items) + ']'
+
+    def _fallback(self, top_n):
+        """Primeiros jogos do catálogo, sem score"""
+        return [(idx, None) for idx in range(min(top_n, len(self.games_data)))]
+
+    def find_game_index(self, game_title):
+        """Índice do primeiro jogo cujo título contém o termo, ou None"""
+        for i, game in enumerate(self.games_data):
+            if game_title.lower() in game['title'].lower():
+                return i
+        return None
+
+
+# ================= TF-IDF EXATO =================
+@register_engine('tfidf')
+class GameRecommender(RecommenderEngine):  # ← NOME EXATO DA CLASSE
+    # Tamanho padrão da shortlist usada no re-ranking por diversidade (MMR)
+    SHORTLIST_SIZE = 50
+
+    def __init__(self, db=None, games=None, shortlist_size=SHORTLIST_SIZE,
+                 analyzer=None, max_features=1000):
         """
         Inicializa o sistema de recomendação
+        shortlist_size: quantos candidatos entram no re-ranking MMR (M)
+        analyzer: GameTextAnalyzer (padrão: português + inglês, sem n-gramas)
+        max_features: tamanho máximo do vocabulário TF-IDF
         """
-        print("Inicializando GameRecommender")
-        self.vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
-        self.games_data = self._get_sample_data()
-        
+        print(f"Inicializando {type(self).__name__}")
+        super().__init__(db=db, games=games)
+        self.shortlist_size = shortlist_size
+        self.analyzer = analyzer or GameTextAnalyzer()
+        self.max_features = max_features
+        self.vectorizer = TfidfVectorizer(analyzer=self.analyzer.analyze, max_features=max_features)
+
         # Prepara dados para ML
         self._prepare_features()
-    
-    def _get_sample_data(self):
-        """Retorna dados de exemplo"""
-        return [
-            {
-                'id': 1,
-                'title': 'The Witcher 3: Wild Hunt',
-                'genre': 'RPG',
-                'platform': 'PC, PS4, XBOX',
-                'price': 79.90,
-                'rating': 9.7,
-                'description': 'RPG de mundo aberto em universo fantástico',
-                'tags': ['rpg', 'open-world', 'fantasy']
-            },
-            {
-                'id': 2,
-                'title': 'Counter-Strike 2',
-                'genre': 'FPS', 
-                'platform': 'PC',
-                'price': 0.00,
-                'rating': 9.3,
-                'description': 'FPS tático multiplayer competitivo',
-                'tags': ['fps', 'multiplayer', 'competitive']
-            },
-            {
-                'id': 3,
-                'title': 'FIFA 23',
-                'genre': 'Sports',
-                'platform': 'PC, PS5, XBOX',
-                'price': 249.90,
-                'rating': 8.5,
-                'description': 'Simulador de futebol com times reais',
-                'tags': ['sports', 'soccer', 'multiplayer']
-            },
-            {
-                'id': 4,
-                'title': 'Cyberpunk 2077',
-                'genre': 'RPG',
-                'platform': 'PC, PS5, XBOX',
-                'price': 199.90,
-                'rating': 8.9,
-                'description': 'RPG de ação em mundo aberto cyberpunk',
-                'tags': ['rpg', 'open-world', 'cyberpunk']
-            },
-            {
-                'id': 5,
-                'title': 'Red Dead Redemption 2',
-                'genre': 'Action-Adventure',
-                'platform': 'PC, PS4, XBOX',
-                'price': 189.90,
-                'rating': 9.8,
-                'description': 'Aventura no velho oeste americano',
-                'tags': ['action', 'adventure', 'open-world']
-            }
-        ]
-    
+
+    def config(self):
+        config = super().config()
+        config.update({
+            'shortlist_size': self.shortlist_size,
+            'max_features': self.max_features,
+            'analyzer': self.analyzer.config_signature(),
+            'char_ngrams': self.analyzer.char_ngrams,
+        })
+        return config
+
     def _prepare_features(self):
         """Prepara os dados para o modelo ML"""
-        # Combina todas as features textuais
-        for game in self.games_data:
-            game['combined_features'] = (
-                f"{game['title']} {game['genre']} {game['platform']} "
-                f"{game['description']} {' '.join(game['tags'])}"
-            )
-        
+        # Tokens normalizados (reaproveita o cache do banco)
+        tokens = self.analyzer.tokenize_games(self.games_data, db=self.db)
+
         # Cria matriz TF-IDF
-        texts = [game['combined_features'] for game in self.games_data]
-        self.tfidf_matrix = self.vectorizer.fit_transform(texts)
-    
-    def recommend_games(self, game_title, top_n=3):
+        self.tfidf_matrix = self.vectorizer.fit_transform(tokens)
+
+    def _title_scores(self, game_index, depth=None):
+        """
+        Similaridade do jogo com todo o catálogo
+        depth: candidatos que o ranking vai consumir (usado por backends parciais)
+        """
+        return cosine_similarity(
+            self.tfidf_matrix[game_index],
+            self.tfidf_matrix
+        )[0]
+
+    def _feature_scores(self, features_vector, depth=None):
+        """Similaridade do vetor de consulta com todo o catálogo"""
+        return cosine_similarity(features_vector, self.tfidf_matrix)[0]
+
+    def _shortlist(self, scores, size, exclude=None):
+        """Retorna os índices dos `size` jogos mais similares, em ordem decrescente"""
+        candidates = np.arange(len(scores))
+        # Backends aproximados marcam jogos não avaliados com -inf
+        candidates = candidates[np.isfinite(scores)]
+        if exclude is not None:
+            candidates = candidates[candidates != exclude]
+        if size <= 0:
+            return candidates[:0]
+
+        # argpartition evita ordenar o catálogo inteiro
+        if size < len(candidates):
+            top = np.argpartition(-scores[candidates], size - 1)[:size]
+            candidates = candidates[top]
+
+        return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+    def _mmr_rerank(self, candidates, scores, top_n, diversity):
         """
-        Recomenda jogos similares baseado no título
+        Re-ranking por Maximal Marginal Relevance sobre a shortlist
+        diversity: 0.0 = só relevância, 1.0 = só diversidade
+        Custo O(M²), independente do tamanho do catálogo
+        """
+        # Linhas do TF-IDF já são normalizadas (L2): produto escalar = cosseno
+        block = self.tfidf_matrix[candidates]
+        pairwise = (block @ block.T).toarray()
+        return self._mmr_select(candidates, scores[candidates], pairwise, top_n, diversity)
+
+    def _mmr_select(self, candidates, relevance, pairwise, top_n, diversity):
+        """Seleção gulosa do MMR dada a relevância e a similaridade entre candidatos"""
+        selected = []
+        remaining = list(range(len(candidates)))
+        max_sim = np.zeros(len(candidates))
+
+        while remaining and len(selected) < top_n:
+            mmr = (1 - diversity) * relevance[remaining] - diversity * max_sim[remaining]
+            best = remaining.pop(int(np.argmax(mmr)))
+            selected.append(best)
+            max_sim = np.maximum(max_sim, pairwise[best])
+
+        return [candidates[i] for i in selected]
+
+    def _depth(self, top_n, diversity):
+        """Quantos candidatos o ranking consome: top_n, ou a shortlist com MMR"""
+        if min(max(float(diversity), 0.0), 1.0) == 0:
+            return top_n
+        return max(top_n, self.shortlist_size)
+
+    def _rank(self, scores, top_n, diversity=0.0, exclude=None):
+        """Seleciona os índices recomendados, aplicando MMR se diversity > 0"""
+        diversity = min(max(float(diversity), 0.0), 1.0)
+        candidates = self._shortlist(scores, self._depth(top_n, diversity), exclude)
+        if diversity == 0:
+            return list(candidates)
+
+        return self._mmr_rerank(candidates, scores, top_n, diversity)
+
+    def rank_by_index(self, game_index, top_n=3, diversity=0.0):
+        """
+        Recomenda jogos similares ao jogo na posição dada
+        diversity: peso do re-ranking MMR (0.0 desliga)
         """
         try:
-            # Encontra o jogo
-            game_index = None
-            for i, game in enumerate(self.games_data):
-                if game_title.lower() in game['title'].lower():
-                    game_index = i
-                    break
-            
-            if game_index is None:
-                return self.games_data[:top_n]  # Fallback
-            
             # Calcula similaridade
-            cosine_sim = cosine_similarity(
-                self.tfidf_matrix[game_index], 
-                self.tfidf_matrix
-            )
-            
-            # Pega os mais similares
-            sim_scores = list(enumerate(cosine_sim[0]))
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-            
+            cosine_sim = self._title_scores(game_index, self._depth(top_n, diversity))
+
             # Retorna recomendações (excluindo o próprio jogo)
-            recommendations = []
-            for i, (idx, score) in enumerate(sim_scores):
-                if idx != game_index:  # Não recomenda o mesmo jogo
-                    rec_game = self.games_data[idx].copy()
-                    rec_game['similarity_score'] = float(score)
-                    recommendations.append(rec_game)
-                if len(recommendations) >= top_n:
-                    break
-            
-            return recommendations
-            
+            return [
+                (idx, float(cosine_sim[idx]))
+                for idx in self._rank(cosine_sim, top_n, diversity, exclude=game_index)
+            ]
+
         except Exception as e:
             print(f"Erro na recomendação: {e}")
-            return self.games_data[:top_n]  # Fallback
-    
-    def recommend_by_features(self, features, top_n=3):
+            return self._fallback(top_n)
+
+    def rank_by_features(self, features, top_n=3, diversity=0.0):
         """
         Recomenda baseado em features textuais
+        diversity: peso do re-ranking MMR (0.0 desliga)
         """
         try:
-            features_vector = self.vectorizer.transform([features])
-            cosine_sim = cosine_similarity(features_vector, self.tfidf_matrix)
-            
-            sim_scores = list(enumerate(cosine_sim[0]))
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-            
+            features_vector = self.vectorizer.transform([self.analyzer.normalize(features)])
+            cosine_sim = self._feature_scores(features_vector, self._depth(top_n, diversity))
+
+            return [(idx, float(cosine_sim[idx])) for idx in self._rank(cosine_sim, top_n, diversity)]
+
+        except Exception as e:
+            print(f"Erro na recomendação por features: {e}")
+            return self._fallback(top_n)
+
+
+# ================= ANN (LSH POR HIPERPLANOS ALEATÓRIOS) =================
+@register_engine('ann')
+class ANNRecommender(GameRecommender):
+    """
+    Busca aproximada: só os jogos que caem no mesmo bucket da consulta em
+    alguma tabela LSH são avaliados. Opcionalmente reduz a dimensão com SVD.
+    """
+
+    def __init__(self, db=None, games=None, n_tables=4, n_bits=12,
+                 n_components=None, min_candidates=10, seed=42, **options):
+        """
+        n_tables: número de tabelas hash (mais tabelas = mais recall)
+        n_bits: bits por hash (mais bits = buckets menores, busca mais rápida)
+        n_components: dimensões após SVD (None = sem redução, vetores esparsos)
+        min_candidates: abaixo disso a consulta é avaliada contra o catálogo todo
+        """
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.n_components = n_components
+        self.min_candidates = min_candidates
+        self.seed = seed
+        super().__init__(db=db, games=games, **options)
+
+    def config(self):
+        config = super().config()
+        config.update({
+            'n_tables': self.n_tables,
+            'n_bits': self.n_bits,
+            'n_components': self.n_components,
+            'min_candidates': self.min_candidates,
+            'seed': self.seed,
+        })
+        return config
+
+    def _prepare_features(self):
+        """Prepara TF-IDF, projeção reduzida e tabelas LSH"""
+        super()._prepare_features()
+
+        self.svd = None
+        vectors = self.tfidf_matrix
+        if self.n_components and self.n_components < min(vectors.shape):
+            self.svd = TruncatedSVD(n_components=self.n_components, random_state=self.seed)
+            vectors = self.svd.fit_transform(vectors)
+        # Sem SVD os vetores continuam esparsos (densificar custaria n x vocabulário)
+        self.vectors = normalize(vectors)
+
+        rng = np.random.default_rng(self.seed)
+        # Hiperplanos de todas as tabelas numa matriz (dimensão, n_tables * n_bits)
+        self.hyperplanes = rng.standard_normal((self.vectors.shape[1], self.n_tables * self.n_bits))
+        self.bit_weights = 1 << np.arange(self.n_bits)
+
+        self.tables = []
+        for keys in self._hash(self.vectors).T:
+            buckets = {}
+            for idx, key in enumerate(keys):
+                buckets.setdefault(int(key), []).append(idx)
+            self.tables.append(buckets)
+
+    def _hash(self, vectors):
+        """Chave do bucket de cada vetor em cada tabela: shape (n, n_tables)"""
+        projections = np.asarray(vectors @ self.hyperplanes)
+        bits = projections.reshape(-1, self.n_tables, self.n_bits) > 0
+        return bits @ self.bit_weights
+
+    def _similarities(self, rows, query):
+        """Produto escalar de cada linha com a consulta (esparso ou denso) -> array 1D"""
+        result = rows @ query.T
+        if issparse(result):
+            result = result.toarray()
+        return np.asarray(result).ravel()
+
+    def _project(self, tfidf_vector):
+        """Vetor TF-IDF -> espaço usado pelo índice (reduzido e normalizado)"""
+        if self.svd is not None:
+            return normalize(self.svd.transform(tfidf_vector))
+        return normalize(tfidf_vector)
+
+    def _candidate_search(self, query, needed=0):
+        """
+        Similaridade só com os candidatos do LSH; demais ficam em -inf
+        needed: candidatos que o ranking precisa (abaixo disso, busca exata)
+        Retorna (scores, stats) com quantos jogos foram avaliados
+        """
+        candidates = set()
+        for table, key in zip(self.tables, self._hash(query)[0]):
+            candidates.update(table.get(int(key), ()))
+
+        # Poucos candidatos (catálogo pequeno ou consulta isolada): busca exata
+        if len(candidates) < max(self.min_candidates, needed):
+            stats = {'scanned': len(self.games_data), 'exact': True}
+            return self._similarities(self.vectors, query), stats
+
+        scores = np.full(len(self.games_data), -np.inf)
+        idx = np.fromiter(candidates, dtype=int)
+        scores[idx] = self._similarities(self.vectors[idx], query)
+        return scores, {'scanned': len(candidates), 'exact': False}
+
+    def _candidate_scores(self, query, needed=0):
+        scores, _ = self._candidate_search(query, needed)
+        return scores
+
+    def query_stats(self, game_index, top_n=3, diversity=0.0):
+        """Quantos jogos a busca por título avalia e se cai na busca exata (avaliação offline)"""
+        query = self.vectors[game_index:game_index + 1]
+        _, stats = self._candidate_search(query, self._depth(top_n, diversity) + 1)
+        return stats
+
+    def _mmr_rerank(self, candidates, scores, top_n, diversity):
+        """MMR com redundância medida no mesmo espaço da relevância (self.vectors)"""
+        block = self.vectors[candidates]
+        pairwise = block @ block.T
+        if issparse(pairwise):
+            pairwise = pairwise.toarray()
+        return self._mmr_select(candidates, scores[candidates], pairwise, top_n, diversity)
+
+    def _title_scores(self, game_index, depth=None):
+        # +1: o próprio jogo cai no seu bucket e é excluído do ranking
+        return self._candidate_scores(self.vectors[game_index:game_index + 1], (depth or 0) + 1)
+
+    def _feature_scores(self, features_vector, depth=None):
+        return self._candidate_scores(self._project(features_vector), depth or 0)
+
+
+# ================= VIZINHOS PRÉ-CALCULADOS =================
+@register_engine('precomputed')
+class PrecomputedRecommender(GameRecommender):
+    """
+    Calcula os K vizinhos de cada jogo no carregamento; recomendações por
+    título viram uma consulta à tabela. Features continuam no TF-IDF exato.
+    """
+
+    def __init__(self, db=None, games=None, n_neighbors=50, max_block_mb=32, **options):
+        """
+        n_neighbors: vizinhos guardados por jogo (K)
+        max_block_mb: memória máxima do bloco de similaridades calculado por vez
+        """
+        self.n_neighbors = n_neighbors
+        self.max_block_mb = max_block_mb
+        super().__init__(db=db, games=games, **options)
+
+    def config(self):
+        config = super().config()
+        config['n_neighbors'] = self.n_neighbors
+        return config
+
+    def _prepare_features(self):
+        """Prepara TF-IDF e a tabela de vizinhos, em blocos para limitar memória"""
+        super()._prepare_features()
+
+        n_games = self.tfidf_matrix.shape[0]
+        k = min(self.n_neighbors, max(n_games - 1, 0))
+        self.neighbors = np.zeros((n_games, k), dtype=int)
+        self.neighbor_scores = np.zeros((n_games, k))
+
+        # Linhas por bloco encolhem com o catálogo: bloco = linhas x n_games floats
+        block_rows = max(1, int(self.max_block_mb * 1024 ** 2 // (8 * max(n_games, 1))))
+
+        for start in range(0, n_games, block_rows):
+            stop = min(start + block_rows, n_games)
+            block = cosine_similarity(self.tfidf_matrix[start:stop], self.tfidf_matrix)
+            for row, scores in enumerate(block):
+                top = self._shortlist(scores, k, exclude=start + row)
+                self.neighbors[start + row] = top
+                self.neighbor_scores[start + row] = scores[top]
+
+    def _title_scores(self, game_index, depth=None):
+        # A tabela só guarda K vizinhos: se o ranking precisa de mais, busca exata
+        if depth is not None and depth > self.neighbors.shape[1]:
+            return super()._title_scores(game_index)
+
+        scores = np.full(len(self.games_data), -np.inf)
+        scores[self.neighbors[game_index]] = self.neighbor_scores[game_index]
+        return scores
+
+
+# ================= FALLBACK POR PALAVRAS-CHAVE =================
+@register_engine('keyword')
+class KeywordRecommender(RecommenderEngine):
+    """Sistema de recomendação simplificado e confiável (sem ML)"""
+
+    def __init__(self, db=None, games=None):
+        print("Sistema de recomendação simples inicializado")
+        super().__init__(db=db, games=games)
+
+    def rank_by_index(self, game_index, top_n=3, diversity=0.0):
+        """Recomenda jogos do mesmo gênero (diversity é ignorado aqui)"""
+        try:
+            target_game = self.games_data[game_index]
+
+            # Recomenda jogos do mesmo gênero
             recommendations = []
-            for i, (idx, score) in enumerate(sim_scores):
-                if i >= top_n:
+            for idx, game in enumerate(self.games_data):
+                if len(recommendations) >= top_n:
                     break
-                rec_game = self.games_data[idx].copy()
-                rec_game['similarity_score'] = float(score)
-                recommendations.append(rec_game)
-            
-            return recommendations
-            
+                if game['title'] != target_game['title'] and game['genre'] == target_game['genre']:
+                    recommendations.append((idx, None))
+
+            return recommendations if recommendations else self._fallback(top_n)
+
+        except Exception as e:
+            print(f"Erro na recomendação simples: {e}")
+            return self._fallback(top_n)
+
+    def rank_by_features(self, features, top_n=3, diversity=0.0):
+        """Recomenda baseado em features textuais (diversity é ignorado aqui)"""
+        try:
+            # Simples matching de keywords
+            words = features.lower().split()
+            recommendations = []
+
+            for idx, game in enumerate(self.games_data):
+                game_text = f"{game['title']} {game['genre']} {game['description']} {' '.join(game['tags'])}".lower()
+
+                if any(word in game_text for word in words):
+                    recommendations.append((idx, None))
+
+            return recommendations[:top_n]
+
         except Exception as e:
             print(f"Erro na recomendação por features: {e}")
-            return self.games_data[:top_n]
+            return self._fallback(top_n)
 
 # Teste do módulo
 if __name__ == '__main__':
     print("Testando GameRecommender")
-    recommender = GameRecommender()
-    recommendations = recommender.recommend_games("The Witcher 3")
+    db = DatabaseManager()
+    for name in sorted(ENGINES):
+        recommender = create_engine(name, db=db)
+        recommendations = recommender.recommend_games("The Witcher 3")
 
-    print("Recomendações:", [r['title'] for r in recommendations])rue)
+        print(f"Recomendações ({name}):", [r['title'] for r in recommendations])
@@ -0,0 +1,35 @@
+﻿"""
+Configuração dos testes: módulos na raiz do projeto e banco temporário,
+para que os testes nunca escrevam no games.db versionado
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app.py lê a configuração no import
+os.environ['GAMEREC_DB'] = os.path.join(tempfile.mkdtemp(), 'games.db')
+os.environ['GAMEREC_ENGINE'] = 'tfidf'
+os.environ.pop('GAMEREC_ENGINE_OPTIONS', None)
+
+from database import DatabaseManager  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Banco temporário com os dados de exemplo"""
+    manager = DatabaseManager(str(tmp_path / 'games.db'))
+    manager.ensure_sample_data()
+    return manager
+
+
+@pytest.fixture
+def client():
+    """Cliente de teste da aplicação Flask"""
+    import app
+    return app.app.test_client()
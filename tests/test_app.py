@@ -0,0 +1,54 @@
+﻿"""Testes da API Flask"""
+
+import pytest
+
+
+@pytest.mark.parametrize('value', ['nan', 'inf', '-0.1', '7', 'abc'])
+def test_title_rejects_invalid_diversity(client, value):
+    response = client.get(f'/api/recommend/title?title=witcher&diversity={value}')
+
+    assert response.status_code == 400
+    assert response.json['success'] is False
+
+
+@pytest.mark.parametrize('value', [float('inf'), 1.5, 'x', True, None])
+def test_features_rejects_invalid_diversity(client, value):
+    response = client.post('/api/recommend/features', json={'features': 'rpg', 'diversity': value})
+
+    assert response.status_code == 400
+
+
+def test_valid_diversity_is_echoed(client):
+    response = client.get('/api/recommend/title?title=witcher&diversity=0.5')
+
+    assert response.status_code == 200
+    assert response.json['diversity'] == 0.5
+
+
+def test_matching_etag_returns_304(client):
+    url = '/api/recommend/title?title=witcher&n=3'
+    first = client.get(url)
+    etag = first.headers['ETag']
+
+    second = client.get(url, headers={'If-None-Match': etag})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+    assert 'Accept-Encoding' in second.headers['Vary']
+
+
+def test_different_query_gets_different_etag(client):
+    first = client.get('/api/recommend/title?title=witcher&n=3')
+    other = client.get('/api/recommend/title?title=witcher&n=4',
+                       headers={'If-None-Match': first.headers['ETag']})
+
+    assert other.status_code == 200
+    assert other.headers['ETag'] != first.headers['ETag']
+
+
+def test_large_responses_are_compressed(client):
+    response = client.get('/api/games', headers={'Accept-Encoding': 'br, gzip'})
+
+    assert response.headers['Content-Encoding'] in ('br', 'gzip')
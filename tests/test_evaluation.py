@@ -0,0 +1,41 @@
+﻿"""Testes da avaliação offline"""
+
+import hashlib
+
+from database import DatabaseManager
+from evaluation import pareto_front, run_evaluation, synthetic_catalog
+
+
+def row(ndcg, p95, memory):
+    return {'ndcg@5': ndcg, 'p95_ms': p95, 'peak_mb': memory}
+
+
+def test_pareto_ignores_tiny_cost_differences():
+    results = pareto_front([row(0.9, 1.0, 0.0870), row(0.9, 1.0, 0.0871)], 'ndcg@5')
+
+    assert [r['pareto'] for r in results] == [True, True]
+
+
+def test_pareto_drops_dominated_configs():
+    results = pareto_front([row(0.9, 1.0, 1.0), row(0.8, 2.0, 2.0), row(0.5, 0.1, 1.0)], 'ndcg@5')
+
+    assert [r['pareto'] for r in results] == [True, False, True]
+
+
+def test_synthetic_catalog_exercises_ann(db):
+    games = synthetic_catalog(db.get_all_games(), 500)
+    configs = [{'engine': 'ann', 'n_tables': 4, 'n_bits': 8, 'min_candidates': 0}]
+
+    table = run_evaluation(configs, games, k=5, repeats=1, max_queries=20)
+
+    assert table.loc[0, 'exact_share'] < 1.0
+    assert table.loc[0, 'scanned'] < len(games)
+
+
+def test_evaluation_does_not_write_to_the_database(db):
+    before = hashlib.sha1(open(db.db_name, 'rb').read()).hexdigest()
+
+    games = DatabaseManager(db.db_name, read_only=True).get_all_games()
+    run_evaluation([{'engine': 'tfidf'}], games, k=3, repeats=1)
+
+    assert hashlib.sha1(open(db.db_name, 'rb').read()).hexdigest() == before
@@ -0,0 +1,83 @@
+﻿"""Testes do GameRecommender: re-ranking por diversidade (MMR)"""
+
+import pytest
+from scipy.sparse import issparse
+
+from recommender import GameRecommender, create_engine
+
+
+def make_game(game_id, title, tags, description):
+    return {
+        'id': game_id, 'title': title, 'genre': 'RPG', 'platform': 'PC',
+        'price': 0.0, 'rating': 9.0, 'description': description, 'tags': tags,
+    }
+
+
+@pytest.fixture
+def near_duplicates(db):
+    """Beta e Gamma são quase cópias de Alpha; Delta é parecido, mas diferente"""
+    games = [
+        make_game(1, 'Alpha', ['dragon', 'sword', 'castle'], 'dragon sword castle'),
+        make_game(2, 'Beta', ['dragon', 'sword', 'castle', 'magic'], 'dragon sword castle'),
+        make_game(3, 'Gamma', ['dragon', 'sword', 'castle', 'knight'], 'dragon sword castle'),
+        make_game(4, 'Delta', ['dragon', 'racing', 'cars'], 'racing cars'),
+        make_game(5, 'Omega', ['soccer', 'ball'], 'soccer ball'),
+    ]
+    return GameRecommender(db=db, games=games)
+
+
+def titles(recommender, ranked):
+    return [recommender.games_data[idx]['title'] for idx, _ in ranked]
+
+
+def test_diversity_zero_orders_by_relevance(near_duplicates):
+    ranked = near_duplicates.rank_by_index(0, 3, diversity=0.0)
+
+    assert titles(near_duplicates, ranked) == ['Beta', 'Gamma', 'Delta']
+    scores = [score for _, score in ranked]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_diversity_demotes_near_duplicates(near_duplicates):
+    ranked = near_duplicates.rank_by_index(0, 3, diversity=0.7)
+    result = titles(near_duplicates, ranked)
+
+    # O mais relevante continua primeiro; a quase cópia sai do top 3
+    assert result[0] == 'Beta'
+    assert 'Gamma' not in result
+    assert 'Alpha' not in result
+
+
+def test_diversity_keeps_requested_size(near_duplicates):
+    assert len(near_duplicates.rank_by_index(0, 4, diversity=0.5)) == 4
+
+
+def test_precomputed_falls_back_to_exact_beyond_k(db):
+    engine = create_engine('precomputed', db=db, n_neighbors=3)
+    exact = create_engine('tfidf', db=db)
+
+    assert len(engine.rank_by_index(0, 3)) == 3
+    assert engine.rank_by_index(0, 6) == exact.rank_by_index(0, 6)
+
+
+def test_ann_keeps_vectors_sparse_without_svd(db):
+    engine = create_engine('ann', db=db, min_candidates=0)
+
+    assert issparse(engine.vectors)
+    assert len(engine.rank_by_index(0, 3)) == 3
+
+
+def test_unknown_engine_options_are_rejected(db):
+    with pytest.raises(ValueError):
+        create_engine('ann', db=db, bogus=1)
+    with pytest.raises(ValueError):
+        create_engine('keyword', db=db, max_features=10)
+    with pytest.raises(ValueError):
+        create_engine('tfdif', db=db)
+
+
+def test_engine_options_reach_the_backend(db):
+    engine = create_engine('ann', db=db, n_tables=2, n_bits=8)
+
+    assert engine.config()['n_tables'] == 2
+    assert engine.config()['n_bits'] == 8
@@ -0,0 +1,59 @@
+﻿"""Testes do pipeline de texto e do cache de tokens"""
+
+import sqlite3
+
+from text_processing import GameTextAnalyzer
+
+
+def cache_rows(db):
+    conn = sqlite3.connect(db.db_name)
+    rows = conn.execute('SELECT game_id, content_hash, tokens FROM token_cache').fetchall()
+    conn.close()
+    return {game_id: (content_hash, tokens) for game_id, content_hash, tokens in rows}
+
+
+def test_cache_row_is_replaced_when_description_changes(db):
+    analyzer = GameTextAnalyzer()
+    games = db.get_all_games()
+    analyzer.tokenize_games(games, db=db)
+    before = cache_rows(db)
+
+    edited = games[0]
+    edited['description'] = 'Descrição totalmente nova com dragões'
+    analyzer.tokenize_games(games, db=db)
+    after = cache_rows(db)
+
+    # Uma linha por jogo: a do jogo editado é substituída, as demais ficam
+    assert len(after) == len(before) == len(games)
+    assert after[edited['id']][0] != before[edited['id']][0]
+    assert 'dragoes' in after[edited['id']][1]
+    assert {k: v for k, v in after.items() if k != edited['id']} == \
+        {k: v for k, v in before.items() if k != edited['id']}
+
+
+def test_unchanged_games_are_not_retokenized(db):
+    analyzer = GameTextAnalyzer()
+    games = db.get_all_games()
+    analyzer.tokenize_games(games, db=db)
+
+    calls = []
+    original = analyzer.tokenize_game
+    analyzer.tokenize_game = lambda game: calls.append(game['id']) or original(game)
+    analyzer.tokenize_games(games, db=db)
+
+    assert calls == []
+
+
+def test_game_words_are_not_stop_words():
+    analyzer = GameTextAnalyzer()
+
+    assert analyzer.normalize('Call of Duty: fire system') == ['call', 'duty', 'fire', 'system']
+    assert analyzer.normalize('RPG de mundo aberto em universo fantástico') == \
+        ['rpg', 'mundo', 'aberto', 'universo', 'fantastico']
+
+
+def test_char_ngrams_do_not_collide_with_words():
+    features = GameTextAnalyzer(char_ngrams=(3, 3)).analyze(['rpg'])
+
+    assert features.count('rpg') == 1
+    assert '#rpg' in features
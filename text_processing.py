@@ -0,0 +1,162 @@
+﻿"""
+MÓDULO: text_processing.py
+DESCRIÇÃO: Pipeline de texto multilíngue (português/inglês) para o recomendador
+HABILIDADES: NLP, Normalização de texto, Stop words, Cache de tokens
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+
+# Versão do pipeline: mudar invalida o cache de tokens no banco
+PIPELINE_VERSION = 2
+
+PORTUGUESE_STOP_WORDS = frozenset("""
+    a à ao aos aquela aquelas aquele aqueles aquilo as às até com como
+    da das de dela delas dele deles depois do dos e é ela elas ele eles
+    em entre era essa essas esse esses esta estas este estes eu foi for
+    há isso isto já lhe lhes mais mas me mesmo meu minha muito na nas
+    nem no nos nós num numa o os ou para pela pelas pelo pelos por qual
+    quando que quem se sem ser seu seus sua suas só também te tem um
+    uma umas uns você vocês
+""".split())
+
+# Lista curta de propósito: a lista do scikit-learn remove palavras que
+# identificam jogos ("call", "fire", "system", "top", "back", "side")
+ENGLISH_STOP_WORDS = frozenset("""
+    a an and are as at be been but by for from has have he her his i if in
+    into is it its me my of on or our she so than that the their them then
+    there these they this those to too us was we were what when where which
+    while who whom why will with you your
+""".split())
+
+# Peso de cada campo: o texto do campo é repetido N vezes na lista de tokens
+DEFAULT_FIELD_WEIGHTS = {
+    'title': 2,
+    'genre': 2,
+    'platform': 1,
+    'description': 1,
+    'tags': 3,
+}
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def fold_accents(text):
+    """Remove acentos: 'fantástico' -> 'fantastico'"""
+    normalized = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in normalized if not unicodedata.combining(ch))
+
+
+class GameTextAnalyzer:
+    def __init__(self, languages=('pt', 'en'), field_weights=None, char_ngrams=None):
+        """
+        Inicializa o analisador de texto
+        languages: idiomas cujas stop words serão removidas
+        field_weights: peso de cada campo do jogo (padrão: DEFAULT_FIELD_WEIGHTS)
+        char_ngrams: tupla (min_n, max_n) para n-gramas de caracteres, ou None
+        """
+        self.languages = tuple(languages)
+        self.field_weights = dict(field_weights or DEFAULT_FIELD_WEIGHTS)
+        self.char_ngrams = tuple(char_ngrams) if char_ngrams else None
+
+        stop_words = set()
+        if 'pt' in self.languages:
+            stop_words |= PORTUGUESE_STOP_WORDS
+        if 'en' in self.languages:
+            stop_words |= ENGLISH_STOP_WORDS
+        self.stop_words = frozenset(fold_accents(word) for word in stop_words)
+
+    def config_signature(self):
+        """Identifica a configuração que afeta os tokens normalizados"""
+        return json.dumps({
+            'version': PIPELINE_VERSION,
+            'languages': sorted(self.languages),
+            'field_weights': self.field_weights,
+        }, sort_keys=True)
+
+    def normalize(self, text):
+        """Texto livre -> lista de tokens normalizados (sem acentos e stop words)"""
+        text = fold_accents(str(text).lower())
+        return [
+            token for token in TOKEN_PATTERN.findall(text)
+            if len(token) > 1 and token not in self.stop_words
+        ]
+
+    def game_text(self, game):
+        """Texto bruto de cada campo ponderado do jogo"""
+        fields = {}
+        for field in self.field_weights:
+            value = game.get(field) or ''
+            if isinstance(value, (list, tuple)):
+                value = ' '.join(value)
+            fields[field] = str(value)
+        return fields
+
+    def content_hash(self, game):
+        """Hash do conteúdo textual do jogo + configuração do pipeline"""
+        payload = json.dumps(
+            [self.config_signature(), self.game_text(game)],
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def tokenize_game(self, game):
+        """Tokens normalizados do jogo, com repetição conforme o peso do campo"""
+        tokens = []
+        for field, text in self.game_text(game).items():
+            tokens.extend(self.normalize(text) * self.field_weights[field])
+        return tokens
+
+    def tokenize_games(self, games, db=None):
+        """
+        Tokeniza uma lista de jogos reaproveitando o cache do banco
+        db: DatabaseManager com cache de tokens (opcional)
+        Jogos sem 'id' são sempre tokenizados e não entram no cache
+        Retorna a lista de tokens na mesma ordem dos jogos
+        """
+        if db is None:
+            # Sem cache: calcular o hash do conteúdo seria custo puro
+            return [self.tokenize_game(game) for game in games]
+
+        game_ids = [game.get('id') for game in games]
+        cached = db.get_cached_tokens([game_id for game_id in game_ids if game_id is not None])
+
+        results = []
+        new_entries = {}
+        for game, game_id in zip(games, game_ids):
+            if game_id is None:
+                results.append(self.tokenize_game(game))
+                continue
+
+            content_hash = self.content_hash(game)
+            cached_hash, tokens = cached.get(game_id, (None, None))
+            if cached_hash != content_hash:
+                tokens = self.tokenize_game(game)
+                new_entries[game_id] = (content_hash, tokens)
+            results.append(tokens)
+
+        if new_entries:
+            db.save_cached_tokens(new_entries)
+
+        return results
+
+    def analyze(self, tokens):
+        """
+        Analisador usado pelo TfidfVectorizer: recebe tokens já normalizados
+        e acrescenta n-gramas de caracteres quando configurado. Os n-gramas
+        recebem o prefixo '#' para não colidirem com palavras ('rpg')
+        """
+        if isinstance(tokens, str):
+            tokens = self.normalize(tokens)
+        if not self.char_ngrams:
+            return list(tokens)
+
+        min_n, max_n = self.char_ngrams
+        features = list(tokens)
+        for token in tokens:
+            padded = f' {token} '
+            for n in range(min_n, max_n + 1):
+                features.extend('#' + padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features